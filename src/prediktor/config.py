@@ -11,6 +11,8 @@ class Config:
     temperature: float = 0.7
     confidence: float = 2.5
     num_beams: int = 6
+    quantization: str = ""
+    attn_implementation: str = ""
 
 
 dotenv.load_dotenv()
@@ -1,20 +1,38 @@
+from typing import Optional
+
 import torch
-from transformers import AutoModelForCausalLM, AutoTokenizer, GenerationConfig, PreTrainedModel, PreTrainedTokenizer
+from transformers import (
+    AutoModelForCausalLM,
+    AutoTokenizer,
+    BitsAndBytesConfig,
+    GenerationConfig,
+    PreTrainedModel,
+    PreTrainedTokenizer,
+)
 
 from prediktor.model.model import Model
 
 
 class HFModel(Model):
-    def __init__(self, model_path: str, max_new_tokens: int):
+    def __init__(
+        self, model_path: str, max_new_tokens: int,
+        quantization: str = "", attn_implementation: str = ""
+    ):
         self._tokenizer = AutoTokenizer.from_pretrained(model_path)
         self._prefix_space_tokenizer = AutoTokenizer.from_pretrained(
             model_path,
             add_prefix_space=True
         )
+        # let the library choose the attention unless set explicitly
+        attn_kwargs = {}
+        if attn_implementation:
+            attn_kwargs["attn_implementation"] = attn_implementation
         self._model = AutoModelForCausalLM.from_pretrained(
             model_path,
             device_map="auto",
-            torch_dtype=torch.bfloat16
+            torch_dtype=torch.bfloat16,
+            quantization_config=_quantization_config(quantization),
+            **attn_kwargs
         )
         self._config = GenerationConfig(
             max_new_tokens=max_new_tokens,
@@ -40,3 +58,22 @@ class HFModel(Model):
     @property
     def config(self) -> GenerationConfig:
         return self._config
+
+
+def _quantization_config(quantization: str) -> Optional[BitsAndBytesConfig]:
+    """Create the config for loading the model with quantized weights.
+
+    Empty string means no quantization.
+    Quantization requires a GPU and the bitsandbytes package.
+    """
+    if not quantization:
+        return None
+    if quantization == "8bit":
+        return BitsAndBytesConfig(load_in_8bit=True)
+    if quantization == "4bit":
+        return BitsAndBytesConfig(
+            load_in_4bit=True,
+            bnb_4bit_compute_dtype=torch.bfloat16,
+            bnb_4bit_quant_type="nf4"
+        )
+    raise ValueError(f"Unknown quantization '{quantization}'.")
@@ -1,9 +1,34 @@
+from typing import Any
+
 import torch
+from transformers import StoppingCriteria, StoppingCriteriaList
 
 from prediktor.config import Config
 from prediktor.model.model import Model
 
 
+class ConfidenceStop(StoppingCriteria):
+    """Stop generation once the confidence drops below zero.
+
+    Every generated token decreases the confidence,
+    more so if the probabilities are low.
+    """
+
+    def __init__(self, confidence: float) -> None:
+        self.confidence = confidence
+        self.stopped = False
+
+    def __call__(
+        self, input_ids: torch.LongTensor, scores: Any, **kwargs: Any
+    ) -> bool:
+        # scores of the last step, already processed by temperature and top-k
+        probabilities = torch.softmax(scores[-1][0], dim=-1)
+        top_probabilities = torch.topk(probabilities, k=3).values
+        self.confidence -= confidence_loss(top_probabilities)
+        self.stopped = self.confidence < 0
+        return self.stopped
+
+
 def generate(model: Model, input_text: str) -> str:
     """Use the model.model to generate a continuation of the input text.
 
@@ -11,35 +36,25 @@ def generate(model: Model, input_text: str) -> str:
     The higher the confidence, the longer the generated text.
     """
     # batch size is always 1
-    input_ids = model.tokenizer.encode(input_text, return_tensors="pt")[0].to(model.device)
-    original_length = input_ids.size(0)
-    max_total_length = input_ids.size(0) + Config.max_length
-
-    with torch.no_grad():
-        confidence = Config.confidence
-        while input_ids.size(0) < max_total_length:
-            # take the last token
-            logits = model.model(input_ids).logits[-1, :]
-            # only sample from the top k tokens
-            top_k = torch.topk(logits, k=Config.top_k)
-            probabilities = torch.softmax(
-                top_k.values / Config.temperature, dim=-1
-            )
-            # stop generation if probabilities are low
-            confidence -= confidence_loss(probabilities)
-            if confidence < 0:
-                break
-
-            next_token_index = torch.multinomial(probabilities, num_samples=1)
-            next_token = top_k.indices[next_token_index]
-            if next_token.item() == model.tokenizer.eos_token_id:
-                break
-            input_ids = torch.cat((input_ids, next_token), dim=-1)
-
-    output_ids = input_ids[original_length:]
-    decoded_text = model.tokenizer.decode(
-        output_ids.squeeze().tolist(), skip_special_tokens=True
+    input_ids = model.tokenizer.encode(input_text, return_tensors="pt").to(model.device)
+    confidence_stop = ConfidenceStop(Config.confidence)
+    outputs = model.model.generate(
+        input_ids,
+        generation_config=model.config,
+        do_sample=True,
+        top_k=Config.top_k,
+        temperature=Config.temperature,
+        stopping_criteria=StoppingCriteriaList([confidence_stop]),
+        # the stopping criteria only receive the scores if they are output
+        output_scores=True,
+        return_dict_in_generate=True
     )
+
+    output_ids = outputs.sequences[0, input_ids.size(1):]
+    if confidence_stop.stopped:
+        # the last token was sampled with too low confidence
+        output_ids = output_ids[:-1]
+    decoded_text = model.tokenizer.decode(output_ids, skip_special_tokens=True)
     return decoded_text
 
 
@@ -8,7 +8,12 @@ from prediktor.model.hf import HFModel
 from prediktor.prediction import prediction
 
 app = flask.Flask(__name__)
-model = HFModel(Config.model_path, Config.max_length)
+model = HFModel(
+    Config.model_path,
+    Config.max_length,
+    Config.quantization,
+    Config.attn_implementation
+)
 
 
 @app.route("/status/")